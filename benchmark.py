@@ -0,0 +1,242 @@
+'''
+Набор бенчмарков горячих путей всех трёх семейств паттернов. Только
+стандартная библиотека.
+
+Каждый сценарий измеряет одну операцию одного модуля и выдаёт время в
+наносекундах на операцию (лучший из нескольких прогонов). Результаты
+пишутся в JSON, их можно сохранить как эталон и сравнивать с ним следующие
+прогоны:
+
+    python benchmark.py --save-baseline
+    python benchmark.py --compare          # код возврата 1 при регрессии
+    python benchmark.py -s proxy -s flyweight --json results.json
+'''
+
+from __future__ import annotations
+import argparse
+import contextlib
+import io
+import json
+import platform
+import sys
+from importlib import import_module
+from pathlib import Path
+from threading import Thread
+from timeit import Timer
+from typing import Callable
+
+ROOT = Path(__file__).resolve().parent
+DEFAULT_BASELINE = ROOT / 'benchmark_baseline.json'
+
+sys.path.insert(0, str(ROOT))
+
+# Сценарий возвращает (операция, число операций за один её вызов).
+Scenario = Callable[[], tuple[Callable[[], object], int]]
+SCENARIOS: dict[str, Scenario] = {}
+
+
+def scenario(name: str) -> Callable[[Scenario], Scenario]:
+    def decorator(setup: Scenario) -> Scenario:
+        SCENARIOS[name] = setup
+        return setup
+    return decorator
+
+
+def load(module: str):
+    # Некоторые модули печатают при импорте.
+    with contextlib.redirect_stdout(io.StringIO()):
+        return import_module(module)
+
+
+@scenario('flyweight')
+def flyweight_lookup():
+    flyweight = load('Структурные.flyweight')
+    states = [['BMW', 'M5', 'red'], ['BMW', 'X6', 'white'],
+              ['Mercedes Benz', 'C300', 'black']]
+    factory = flyweight.FlyweightFactory(states)
+    get = factory.get_flyweight
+
+    def run():
+        for state in states:
+            get(state)
+    return run, len(states)
+
+
+@scenario('composite')
+def composite_evaluation():
+    composer = load('Структурные.composer')
+    tree = composer.Composite()
+    for _ in range(10):
+        branch = composer.Composite()
+        for _ in range(10):
+            branch.add(composer.Leaf())
+        tree.add(branch)
+    return tree.operation, 111
+
+
+@scenario('chain')
+def chain_dispatch():
+    chain = load('Поведенческие.chain_of_responsobility')
+    monkey = chain.MonkeyHandler()
+    monkey.set_next(chain.SquirrelHandler()).set_next(chain.DogHandler())
+    requests = ['Banana', 'Nut', 'MeatBall', 'Cup of coffee']
+
+    def run():
+        for request in requests:
+            monkey.handle(request)
+    return run, len(requests)
+
+
+@scenario('command')
+def command_execution():
+    command = load('Поведенческие.command')
+    invoker = command.Invoker()
+    invoker.set_on_start(command.SimpleCommand('Say Hi'))
+    invoker.set_on_finish(command.ComplexCommand(
+        command.Receiver(), 'Send email', 'Save report'))
+    return invoker.do_something_important, 1
+
+
+@scenario('decorator')
+def decorator_stacking():
+    decorator = load('Структурные.decorator')
+    component = decorator.ConcreteComponent()
+    for _ in range(5):
+        component = decorator.ConcreteDecoratorB(
+            decorator.ConcreteDecoratorA(component))
+    return component.operation, 1
+
+
+@scenario('proxy')
+def proxy_forwarding():
+    assistant = load('Структурные.assistant')
+    proxy = assistant.Proxy(assistant.RealSubject())
+    return proxy.request, 1
+
+
+@scenario('prototype')
+def prototype_cloning():
+    prototype = load('Порождающие.prototype')
+    graph = prototype.build_graph(100)
+    return (lambda: prototype.fast_clone(graph)), len(graph)
+
+
+@scenario('builder')
+def builder_production():
+    builder = load('Порождающие.builder')
+    director = builder.Director()
+    director.builder = builder.ConcreteBuilder1()
+
+    def run():
+        director.build_full_featured_product()
+        director.builder.product
+    return run, 1
+
+
+@scenario('singleton')
+def singleton_contention():
+    singleton = load('Порождающие.singletone_metaclass')
+    threads, calls = 4, 2_000
+
+    def worker():
+        for _ in range(calls):
+            singleton.Singleton('bench')
+
+    def run():
+        workers = [Thread(target=worker) for _ in range(threads)]
+        for thread in workers:
+            thread.start()
+        for thread in workers:
+            thread.join()
+    return run, threads * calls
+
+
+def measure(setup: Scenario, repeat: int = 5,
+            min_time: float = 0.2) -> dict[str, float]:
+    '''
+    Подбирает число повторов так, чтобы один прогон шёл не меньше min_time
+    секунд, и берёт лучший результат из repeat прогонов. Вывод паттернов
+    подавляется, чтобы не мерить терминал.
+    '''
+    with contextlib.redirect_stdout(io.StringIO()) as sink:
+        run, ops = setup()
+        timer = Timer(run)
+        number = 1
+        while timer.timeit(number) < min_time:
+            sink.seek(0)
+            sink.truncate()
+            number *= 2
+        best = min(timer.repeat(repeat=repeat, number=number))
+        sink.seek(0)
+        sink.truncate()
+    return {'ns_per_op': best / (number * ops) * 1e9,
+            'ops': number * ops}
+
+
+def run_all(names: list[str] | None = None, **kwargs) -> dict:
+    names = names or list(SCENARIOS)
+    unknown = set(names) - set(SCENARIOS)
+    if unknown:
+        raise SystemExit(f'unknown scenarios: {", ".join(sorted(unknown))}')
+    return {
+        'python': platform.python_version(),
+        'implementation': platform.python_implementation(),
+        'results': {name: measure(SCENARIOS[name], **kwargs) for name in names},
+    }
+
+
+def compare(current: dict, baseline: dict,
+            tolerance: float) -> list[tuple[str, float, float, float]]:
+    '''
+    Возвращает сценарии, которые стали медленнее эталона больше, чем на
+    tolerance (0.2 = на 20%): (имя, эталон, сейчас, отношение).
+    '''
+    regressions = []
+    for name, result in current['results'].items():
+        reference = baseline['results'].get(name)
+        if reference is None:
+            continue
+        ratio = result['ns_per_op'] / reference['ns_per_op']
+        if ratio > 1 + tolerance:
+            regressions.append(
+                (name, reference['ns_per_op'], result['ns_per_op'], ratio))
+    return regressions
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(
+        description='Бенчмарки горячих путей паттернов.')
+    parser.add_argument('-s', '--scenario', action='append', dest='scenarios',
+                        choices=sorted(SCENARIOS), help='run only these')
+    parser.add_argument('--json', type=Path, help='write results to a file')
+    parser.add_argument('--baseline', type=Path, default=DEFAULT_BASELINE)
+    parser.add_argument('--save-baseline', action='store_true')
+    parser.add_argument('--compare', action='store_true')
+    parser.add_argument('--tolerance', type=float, default=0.2)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args(argv)
+
+    results = run_all(args.scenarios, repeat=args.repeat)
+    for name, result in results['results'].items():
+        print(f'{name:<12} {result["ns_per_op"]:12.1f} ns/op')
+
+    if args.json:
+        args.json.write_text(json.dumps(results, indent=2))
+    if args.save_baseline:
+        args.baseline.write_text(json.dumps(results, indent=2))
+        print(f'Baseline saved to {args.baseline}')
+    if args.compare:
+        if not args.baseline.exists():
+            print(f'No baseline at {args.baseline}, nothing to compare')
+            return 0
+        baseline = json.loads(args.baseline.read_text())
+        regressions = compare(results, baseline, args.tolerance)
+        for name, before, after, ratio in regressions:
+            print(f'REGRESSION {name}: {before:.1f} -> {after:.1f} ns/op '
+                  f'(x{ratio:.2f})')
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
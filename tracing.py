@@ -0,0 +1,197 @@
+'''
+Подключаемая трассировка горячих путей паттернов: счётчики вызовов, время и
+выборочные спаны.
+
+Классы паттернов сами ничего не проверяют. При enable() трассировщик
+подменяет нужные методы обёртками, а при disable() возвращает оригиналы,
+поэтому выключенная трассировка ничего не стоит. Статистика копится в
+словарях каждого потока отдельно, без блокировок, и сводится только при
+экспорте.
+
+    tracer = Tracer(sample_every=100)
+    tracer.enable_defaults()
+    ...
+    print(tracer.report())
+    tracer.disable()
+'''
+
+from __future__ import annotations
+import json
+import sys
+from collections import deque
+from functools import wraps
+from importlib import import_module
+from pathlib import Path
+from threading import Lock, get_ident, local
+from time import perf_counter_ns
+from typing import Any, Callable
+
+ROOT = Path(__file__).resolve().parent
+
+# (модуль, класс, метод) - методы подменяются и у всех подклассов, которые
+# их переопределяют.
+DEFAULT_TARGETS = [
+    ('Поведенческие.chain_of_responsobility', 'Handler', 'handle'),
+    ('Поведенческие.command', 'Invoker', 'do_something_important'),
+    ('Структурные.assistant', 'Proxy', 'request'),
+    ('Структурные.decorator', 'Decorator', 'operation'),
+    ('Структурные.flyweight', 'FlyweightFactory', 'get_flyweight'),
+]
+
+
+class Tracer:
+    """
+    Трассировщик. sample_every задаёт, каждый какой вызов метода записать
+    как спан (0 - не записывать спаны вовсе); хранится не больше max_spans
+    последних спанов.
+    """
+
+    def __init__(self, sample_every: int = 100,
+                 max_spans: int = 10_000) -> None:
+        self.sample_every = sample_every
+        self._spans: deque = deque(maxlen=max_spans)
+        self._local = local()
+        self._thread_stats: list[dict[str, list[int]]] = []
+        self._stats_lock = Lock()
+        self._patched: list[tuple[type, str, Any]] = []
+
+    def _stats(self) -> dict[str, list[int]]:
+        # Свой словарь у каждого потока: [вызовы, суммарно нс, максимум нс].
+        try:
+            return self._local.stats
+        except AttributeError:
+            stats = self._local.stats = {}
+            with self._stats_lock:
+                self._thread_stats.append(stats)
+            return stats
+
+    def _wrap(self, name: str, method: Callable) -> Callable:
+        tracer = self
+        spans = self._spans
+        sample_every = self.sample_every
+
+        @wraps(method)
+        def traced(*args, **kwargs):
+            start = perf_counter_ns()
+            try:
+                return method(*args, **kwargs)
+            finally:
+                elapsed = perf_counter_ns() - start
+                stats = tracer._stats()
+                entry = stats.get(name)
+                if entry is None:
+                    entry = stats[name] = [0, 0, 0]
+                entry[0] += 1
+                entry[1] += elapsed
+                if elapsed > entry[2]:
+                    entry[2] = elapsed
+                if sample_every and entry[0] % sample_every == 0:
+                    spans.append((name, start, elapsed, get_ident()))
+
+        traced.__traced__ = method
+        return traced
+
+    def instrument(self, cls: type, method_name: str) -> None:
+        '''
+        Подменяет метод у класса и у всех его подклассов, где он
+        переопределён.
+        '''
+        classes = [cls]
+        while classes:
+            current = classes.pop()
+            classes.extend(current.__subclasses__())
+            original = current.__dict__.get(method_name)
+            if original is None or hasattr(original, '__traced__'):
+                continue
+            name = f'{current.__qualname__}.{method_name}'
+            setattr(current, method_name, self._wrap(name, original))
+            self._patched.append((current, method_name, original))
+
+    def enable(self, targets: list[tuple[str, str, str]]) -> None:
+        if str(ROOT) not in sys.path:
+            sys.path.insert(0, str(ROOT))
+        for module_name, class_name, method_name in targets:
+            cls = getattr(import_module(module_name), class_name)
+            self.instrument(cls, method_name)
+
+    def enable_defaults(self) -> None:
+        self.enable(DEFAULT_TARGETS)
+
+    def disable(self) -> None:
+        while self._patched:
+            cls, method_name, original = self._patched.pop()
+            setattr(cls, method_name, original)
+
+    def __enter__(self) -> Tracer:
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.disable()
+
+    def reset(self) -> None:
+        with self._stats_lock:
+            for stats in self._thread_stats:
+                stats.clear()
+        self._spans.clear()
+
+    def stats(self) -> dict[str, dict[str, float]]:
+        '''
+        Сводная статистика по всем потокам.
+        '''
+        merged: dict[str, list[int]] = {}
+        with self._stats_lock:
+            thread_stats = [dict(stats) for stats in self._thread_stats]
+        for stats in thread_stats:
+            for name, (calls, total, longest) in stats.items():
+                entry = merged.setdefault(name, [0, 0, 0])
+                entry[0] += calls
+                entry[1] += total
+                entry[2] = max(entry[2], longest)
+        return {
+            name: {
+                'calls': calls,
+                'total_ms': total / 1e6,
+                'mean_us': total / calls / 1e3,
+                'max_us': longest / 1e3,
+            }
+            for name, (calls, total, longest) in sorted(merged.items())
+        }
+
+    def spans(self) -> list[dict[str, Any]]:
+        return [
+            {'name': name, 'start_ns': start, 'duration_ns': duration,
+             'thread': thread}
+            for name, start, duration, thread in list(self._spans)
+        ]
+
+    def export_json(self, path: str | Path) -> None:
+        Path(path).write_text(json.dumps(
+            {'stats': self.stats(), 'spans': self.spans()}, indent=2,
+            ensure_ascii=False,
+        ))
+
+    def report(self) -> str:
+        lines = [f'{"method":<40} {"calls":>8} {"mean us":>10} {"max us":>10}']
+        for name, stat in self.stats().items():
+            lines.append(f'{name:<40} {stat["calls"]:>8} '
+                         f'{stat["mean_us"]:>10.2f} {stat["max_us"]:>10.2f}')
+        return '\n'.join(lines)
+
+
+if __name__ == '__main__':
+    import contextlib
+    import io
+
+    with Tracer(sample_every=10) as tracer:
+        tracer.enable_defaults()
+        chain = import_module('Поведенческие.chain_of_responsobility')
+        assistant = import_module('Структурные.assistant')
+        monkey = chain.MonkeyHandler()
+        monkey.set_next(chain.SquirrelHandler()).set_next(chain.DogHandler())
+        proxy = assistant.Proxy(assistant.RealSubject())
+        with contextlib.redirect_stdout(io.StringIO()):
+            for _ in range(1000):
+                monkey.handle('MeatBall')
+                proxy.request()
+        print(tracer.report())
+        print(f'Sampled spans: {len(tracer.spans())}')
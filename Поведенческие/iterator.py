@@ -0,0 +1,209 @@
+'''
+Итератор - это поведенческий паттерн, позволяющий последовательно обходить
+сложную коллекцию, без раскрытия деталей её реализации.
+
+Благодаря Итератору, клиент может обходить разные коллекции одним и тем же
+способом, используя единый интерфейс итераторов.
+
+Применимость: Паттерн можно часто встретить в Python-коде, особенно в
+программах, работающих с большими наборами данных. Сам язык построен вокруг
+протокола итераторов (__iter__ и __next__).
+
+Признаки применения паттерна: Итератор легко определить по методам навигации
+(например, получения следующего/предыдущего элемента и т. д.). Код использующий
+итератор зачастую вообще не имеет ссылок на коллекцию, с которой работает
+итератор.
+'''
+
+from __future__ import annotations
+from collections.abc import Iterable, Iterator, Sequence
+from itertools import islice
+from typing import Any, Callable
+
+
+class SequenceIterator(Iterator):
+    """
+    Конкретный Итератор хранит только текущую позицию и ссылку на
+    коллекцию, поэтому обход не копирует данные. Параметр reverse задаёт
+    направление обхода.
+    """
+
+    def __init__(self, items: Sequence, reverse: bool = False,
+                 position: int | None = None) -> None:
+        self._items = items
+        self._reverse = reverse
+        if position is None:
+            position = len(items) - 1 if reverse else 0
+        self._position = position
+
+    @property
+    def position(self) -> int:
+        return self._position
+
+    def __next__(self) -> Any:
+        position = self._position
+        if position < 0 or position >= len(self._items):
+            raise StopIteration
+        self._position = position - 1 if self._reverse else position + 1
+        return self._items[position]
+
+
+class Cursor(SequenceIterator):
+    """
+    Курсор - итератор, который можно сохранить и продолжить позже, например
+    после перезапуска конвейера. Контрольная точка - простой словарь, его
+    можно сериализовать в JSON. Длина коллекции записывается в точку, чтобы
+    не продолжить обход уже другой коллекции.
+    """
+
+    def checkpoint(self) -> dict[str, Any]:
+        return {
+            'position': self._position,
+            'reverse': self._reverse,
+            'length': len(self._items),
+        }
+
+    @classmethod
+    def restore(cls, items: Sequence, state: dict[str, Any]) -> Cursor:
+        if state['length'] != len(items):
+            raise ValueError('checkpoint was taken on a collection of '
+                             f'{state["length"]} items, got {len(items)}')
+        return cls(items, reverse=state['reverse'], position=state['position'])
+
+
+class ReversedView(Sequence):
+    """
+    Перевёрнутое представление коллекции: индексы пересчитываются на лету,
+    копия не создаётся.
+    """
+
+    def __init__(self, items: Sequence) -> None:
+        self._items = items
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError('view index out of range')
+        return self._items[len(self._items) - 1 - index]
+
+    def __iter__(self) -> Iterator:
+        return SequenceIterator(self._items, reverse=True)
+
+    def __reversed__(self) -> Iterator:
+        return SequenceIterator(self._items)
+
+
+class FilteredView(Iterable):
+    """
+    Отфильтрованное представление: предикат применяется во время обхода,
+    промежуточный список не строится.
+    """
+
+    def __init__(self, items: Iterable,
+                 predicate: Callable[[Any], bool]) -> None:
+        self._items = items
+        self._predicate = predicate
+
+    def __iter__(self) -> Iterator:
+        return filter(self._predicate, self._items)
+
+    def filter(self, predicate: Callable[[Any], bool]) -> FilteredView:
+        return FilteredView(self, predicate)
+
+    def chunks(self, size: int) -> Iterator[list]:
+        return batched(self, size)
+
+
+def batched(items: Iterable, size: int) -> Iterator[list]:
+    '''
+    Разбивает любой итерируемый объект на пачки по size элементов (последняя
+    может быть короче). В памяти одновременно находится только одна пачка.
+    '''
+    if size < 1:
+        raise ValueError('size must be at least 1')
+    iterator = iter(items)
+    while batch := list(islice(iterator, size)):
+        yield batch
+
+
+def sliced(items: Sequence, size: int) -> Iterator[Sequence]:
+    '''
+    Разбивает последовательность на срезы по size элементов. Для memoryview,
+    array и подобных типов срез - это представление без копирования, что
+    удобно для векторизованных потребителей.
+    '''
+    if size < 1:
+        raise ValueError('size must be at least 1')
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+class WordsCollection(Iterable):
+    """
+    Конкретная Коллекция предоставляет методы для получения итераторов и
+    представлений. Сами данные коллекция не копирует: она лишь оборачивает
+    переданную последовательность.
+    """
+
+    def __init__(self, items: Sequence | None = None) -> None:
+        self._items = items if items is not None else []
+
+    def __iter__(self) -> SequenceIterator:
+        return SequenceIterator(self._items)
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def reverse(self) -> ReversedView:
+        return ReversedView(self._items)
+
+    def filter(self, predicate: Callable[[Any], bool]) -> FilteredView:
+        return FilteredView(self._items, predicate)
+
+    def chunks(self, size: int) -> Iterator[Sequence]:
+        return sliced(self._items, size)
+
+    def cursor(self, reverse: bool = False) -> Cursor:
+        return Cursor(self._items, reverse=reverse)
+
+    def resume(self, state: dict[str, Any]) -> Cursor:
+        return Cursor.restore(self._items, state)
+
+    def add_item(self, item: Any) -> None:
+        self._items.append(item)
+
+
+if __name__ == '__main__':
+    collection = WordsCollection()
+    collection.add_item('First')
+    collection.add_item('Second')
+    collection.add_item('Third')
+
+    print('Straight traversal:')
+    print('\n'.join(collection))
+    print('')
+
+    print('Reverse traversal:')
+    print('\n'.join(collection.reverse()), end='\n\n')
+
+    print('Filtered traversal:')
+    print('\n'.join(collection.filter(lambda word: 'i' in word)), end='\n\n')
+
+    print('Chunked traversal:')
+    numbers = WordsCollection(memoryview(bytes(range(10))))
+    for chunk in numbers.chunks(4):
+        print(list(chunk))
+    print('')
+
+    print('Resumable traversal:')
+    cursor = collection.cursor()
+    print(next(cursor))
+    state = cursor.checkpoint()
+    print(f'Checkpoint: {state}')
+    print('\n'.join(collection.resume(state)))
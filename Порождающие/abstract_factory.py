@@ -19,6 +19,9 @@
 
 from __future__ import annotations
 from abc import ABC, abstractmethod
+from importlib import import_module
+from importlib.metadata import entry_points
+from time import perf_counter
 
 
 class AbstractFactory(ABC):
@@ -39,6 +42,17 @@ class AbstractFactory(ABC):
     def create_product_b(self) -> AbstractProductB:
         pass
 
+    def create_products_a(self, n: int) -> list[AbstractProductA]:
+        '''
+        Пакетное создание: метод фабрики находится один раз на всю пачку.
+        '''
+        create = self.create_product_a
+        return [create() for _ in range(n)]
+
+    def create_products_b(self, n: int) -> list[AbstractProductB]:
+        create = self.create_product_b
+        return [create() for _ in range(n)]
+
 
 class ConcreteFactory1(AbstractFactory):
     '''
@@ -69,6 +83,8 @@ class ConcreteFactory2(AbstractFactory):
 
 class AbstractProductA(ABC):
 
+    __slots__ = ()
+
     @abstractmethod
     def useful_function_a(self) -> str: pass
 
@@ -80,6 +96,8 @@ class AbstractProductB(ABC):
     только между продуктами одной и той же конкретной вариации.
     '''
 
+    __slots__ = ()
+
     @abstractmethod
     def useful_function_b(self) -> str:
         '''
@@ -100,18 +118,24 @@ class AbstractProductB(ABC):
 
 class ConcreteProductA1(AbstractProductA):
 
+    __slots__ = ()
+
     def useful_function_a(self):
         return 'The result of the product A1.'
 
 
 class ConcreteProductA2(AbstractProductA):
 
+    __slots__ = ()
+
     def useful_function_a(self):
         return 'The result of the product A2.'
 
 
 class ConcreteProductB1(AbstractProductB):
 
+    __slots__ = ()
+
     def useful_function_b(self):
         return 'The result of the product B1.'
 
@@ -122,6 +146,8 @@ class ConcreteProductB1(AbstractProductB):
 
 class ConcreteProductB2(AbstractProductB):
 
+    __slots__ = ()
+
     def useful_function_b(self):
         return 'The result of the product B2.'
 
@@ -130,6 +156,163 @@ class ConcreteProductB2(AbstractProductB):
         return f'The result of the B2 collaborating with the {result}'
 
 
+class PooledFactory(AbstractFactory):
+    '''
+    Обёртка над любой фабрикой, которая переиспользует продукты вместо
+    создания новых. Продукты без состояния (у них __slots__ = ()), поэтому
+    возвращённый через release() продукт можно сразу выдать снова. Пулы
+    ограничены max_size, лишние продукты просто отдаются сборщику мусора.
+
+    Пул запоминает, продукты каких классов выдавала обёрнутая фабрика, и
+    release() принимает только их: продукт чужого семейства или вовсе не
+    продукт вызывает TypeError, иначе его выдали бы как продукт этой
+    фабрики.
+    '''
+
+    def __init__(self, factory: AbstractFactory, max_size: int = 1024) -> None:
+        self._factory = factory
+        self._max_size = max_size
+        self._pool_a: list[AbstractProductA] = []
+        self._pool_b: list[AbstractProductB] = []
+        self._types_a: set[type] = set()
+        self._types_b: set[type] = set()
+        self.created = 0
+        self.reused = 0
+        self.released = 0
+        self.dropped = 0
+
+    def create_product_a(self) -> AbstractProductA:
+        if self._pool_a:
+            self.reused += 1
+            return self._pool_a.pop()
+        self.created += 1
+        product = self._factory.create_product_a()
+        self._types_a.add(type(product))
+        return product
+
+    def create_product_b(self) -> AbstractProductB:
+        if self._pool_b:
+            self.reused += 1
+            return self._pool_b.pop()
+        self.created += 1
+        product = self._factory.create_product_b()
+        self._types_b.add(type(product))
+        return product
+
+    def _take(self, pool: list, types: set[type], create, n: int) -> list:
+        reused = min(n, len(pool))
+        products = pool[len(pool) - reused:]
+        del pool[len(pool) - reused:]
+        created = [create() for _ in range(n - reused)]
+        types.update(map(type, created))
+        products.extend(created)
+        self.reused += reused
+        self.created += n - reused
+        return products
+
+    def create_products_a(self, n: int) -> list[AbstractProductA]:
+        return self._take(self._pool_a, self._types_a,
+                          self._factory.create_product_a, n)
+
+    def create_products_b(self, n: int) -> list[AbstractProductB]:
+        return self._take(self._pool_b, self._types_b,
+                          self._factory.create_product_b, n)
+
+    def release(self, *products: AbstractProductA | AbstractProductB) -> None:
+        for product in products:
+            cls = type(product)
+            if cls in self._types_a:
+                pool = self._pool_a
+            elif cls in self._types_b:
+                pool = self._pool_b
+            else:
+                raise TypeError(
+                    f'{cls.__name__} was not created by '
+                    f'{type(self._factory).__name__}'
+                )
+            if len(pool) < self._max_size:
+                pool.append(product)
+                self.released += 1
+            else:
+                self.dropped += 1
+
+    def stats(self) -> dict[str, int]:
+        return {
+            'created': self.created,
+            'reused': self.reused,
+            'released': self.released,
+            'dropped': self.dropped,
+            'pooled_a': len(self._pool_a),
+            'pooled_b': len(self._pool_b),
+        }
+
+
+class FactoryRegistry:
+    '''
+    Реестр фабрик по имени вариации. Фабрики объявляются строками в стиле
+    entry points ("пакет.модуль:Класс") и импортируются только при первом
+    обращении, так что запуск сервиса платит лишь за те семейства, которые
+    он действительно использует. Время импорта каждого семейства
+    записывается и выводится в report().
+    '''
+
+    def __init__(self) -> None:
+        self._declarations: dict[str, str] = {}
+        self._factories: dict[str, AbstractFactory] = {}
+        self.import_times: dict[str, float] = {}
+
+    def declare(self, variant: str, target: str) -> None:
+        if ':' not in target:
+            raise ValueError(f'expected "module:attribute", got {target!r}')
+        self._declarations[variant] = target
+        self._factories.pop(variant, None)
+
+    def load_entry_points(self, group: str) -> None:
+        '''
+        Добавляет объявления из entry points установленных пакетов.
+        '''
+        for entry_point in entry_points(group=group):
+            self.declare(entry_point.name, entry_point.value)
+
+    @property
+    def variants(self) -> list[str]:
+        return sorted(self._declarations)
+
+    def is_loaded(self, variant: str) -> bool:
+        return variant in self._factories
+
+    def get(self, variant: str) -> AbstractFactory:
+        factory = self._factories.get(variant)
+        if factory is None:
+            try:
+                target = self._declarations[variant]
+            except KeyError:
+                raise LookupError(f'unknown factory variant {variant!r}') from None
+            module_name, _, attribute = target.partition(':')
+            t0 = perf_counter()
+            module = import_module(module_name)
+            self.import_times[variant] = perf_counter() - t0
+            factory_cls = module
+            for name in attribute.split('.'):
+                factory_cls = getattr(factory_cls, name)
+            factory = self._factories[variant] = factory_cls()
+        return factory
+
+    def report(self) -> str:
+        '''
+        Отчёт о стоимости импорта по семействам: загруженные - по убыванию
+        времени, затем ещё не загруженные.
+        '''
+        lines = [f'{"variant":<16} import time']
+        for variant, seconds in sorted(self.import_times.items(),
+                                       key=lambda item: -item[1]):
+            lines.append(f'{variant:<16} {seconds * 1e3:8.3f} ms')
+        for variant in self.variants:
+            if variant not in self.import_times:
+                lines.append(f'{variant:<16} not loaded')
+        return '\n'.join(lines)
+
+
 def clicode(factory: AbstractFactory) -> None:
     prod_a = factory.create_product_a()
     prod_b = factory.create_product_b()
@@ -142,4 +325,21 @@ if __name__ == '__main__':
     clicode(ConcreteFactory1())
     print('\n')
     print('Client: Testing the same client code with the second factory type:')
-    clicode(ConcreteFactory2())
\ No newline at end of file
+    clicode(ConcreteFactory2())
+    print('\n')
+
+    registry = FactoryRegistry()
+    registry.declare('variant1', f'{__name__}:ConcreteFactory1')
+    registry.declare('variant2', f'{__name__}:ConcreteFactory2')
+    print('Client: Testing client code with a lazily loaded factory:')
+    clicode(registry.get('variant1'))
+    print()
+    print(registry.report())
+    print('\n')
+
+    print('Client: Testing client code with a pooled factory:')
+    pooled = PooledFactory(ConcreteFactory2())
+    for _ in range(3):
+        products = pooled.create_products_a(100) + pooled.create_products_b(100)
+        pooled.release(*products)
+    print(pooled.stats())
\ No newline at end of file
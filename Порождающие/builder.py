@@ -16,7 +16,11 @@ someBuilde.setValue(1).setValue(2).create())
 
 from __future__ import annotations
 from abc import ABC, abstractmethod
-from typing import Any
+from io import SEEK_END
+from tempfile import TemporaryFile
+from types import GeneratorType
+from typing import Any, Callable, Generator, Iterator, TextIO
+import sys
 
 
 class Builder(ABC):
@@ -91,6 +95,86 @@ class ConcreteBuilder1(Builder):
         return self
 
 
+class PooledBuilder1(ConcreteBuilder1):
+    '''
+    Строитель, который переиспользует продукты. Клиент возвращает ненужный
+    продукт через release(), его список parts очищается на месте, и при
+    следующем reset() строитель берёт продукт из пула вместо создания нового.
+    Повторный release() продукта, который уже лежит в пуле, ничего не
+    делает, иначе один продукт достался бы двум сборкам.
+    '''
+
+    def __init__(self, max_pool_size: int = 1024) -> None:
+        self._pool: list[Product1] = []
+        self._pooled: set[int] = set()
+        self._max_pool_size = max_pool_size
+        self.created = 0
+        self.reused = 0
+        super().__init__()
+
+    def reset(self) -> None:
+        if self._pool:
+            self._product = self._pool.pop()
+            self._pooled.discard(id(self._product))
+            self.reused += 1
+        else:
+            self._product = Product1()
+            self.created += 1
+
+    def release(self, product: Product1) -> None:
+        if id(product) in self._pooled:
+            return
+        if len(self._pool) < self._max_pool_size:
+            product.parts.clear()
+            self._pool.append(product)
+            self._pooled.add(id(product))
+
+
+class Recipe:
+    '''
+    Рецепт - это записанная последовательность шагов строителя. Его можно
+    проиграть на любом строителе: связанные методы находятся один раз, а
+    затем просто вызываются по кругу для каждого продукта.
+    '''
+
+    def __init__(self, steps: tuple[str, ...]) -> None:
+        self.steps = steps
+
+    def replay(self, builder: Builder, n: int = 1) -> list:
+        steps = [getattr(builder, name) for name in self.steps]
+        products = []
+        append = products.append
+        for _ in range(n):
+            for step in steps:
+                step()
+            append(builder.product)
+        return products
+
+    def __repr__(self) -> str:
+        return f'Recipe({" > ".join(self.steps)})'
+
+
+class _RecordingBuilder:
+    '''
+    Подставляется директору вместо строителя и лишь запоминает вызванные
+    шаги.
+    '''
+
+    def __init__(self) -> None:
+        self.steps: list[str] = []
+
+    def __getattr__(self, name: str) -> Callable[[], _RecordingBuilder]:
+        if not name.startswith('produce_'):
+            raise AttributeError(name)
+
+        def step(*args, **kwargs):
+            if args or kwargs:
+                raise TypeError('recipes support only steps without arguments')
+            self.steps.append(name)
+            return self
+        return step
+
+
 class Product1():
     '''
     Имеет смысл использовать паттерн Строитель только тогда, когда ваши продукты
@@ -110,6 +194,102 @@ class Product1():
         print(f'Product parts: {", ".join(self.parts)}', end='')
 
 
+class StreamingProduct1(Product1):
+    '''
+    Продукт, который не держит части в памяти, а сразу отдаёт их в приёмник:
+    текстовый файл (по части на строку) или генератор-потребитель, которому
+    части передаются через send(). Для файлового приёмника list_parts
+    перечитывает файл построчно, так что память не растёт с числом частей.
+
+    Файл общий для записи и чтения, поэтому каждый обход помнит свою
+    позицию, а запись всегда идёт в конец: части можно добавлять и во время
+    обхода. Часть с переводом строки в файл не записать, такие части
+    отклоняются.
+    '''
+
+    def __init__(self, sink: TextIO | Generator[None, Any, None]) -> None:
+        self._sink = sink
+        self.count = 0
+        # Позиция того, кто последним двигал файл: список [offset] обхода
+        # или None, если это была запись.
+        self._owner: list[int] | None = None
+        if isinstance(sink, GeneratorType):
+            next(sink)
+            self._write = sink.send
+        else:
+            self._write = self._write_line
+
+    @property
+    def parts(self) -> Iterator[str]:
+        return self.iter_parts()
+
+    def add(self, part: Any) -> None:
+        self._write(part)
+        self.count += 1
+
+    def _write_line(self, part: Any) -> None:
+        text = str(part)
+        if '\n' in text or '\r' in text:
+            raise ValueError(f'part {text!r} contains a line break')
+        if self._owner is not None:
+            self._claim(None)
+        self._sink.write(f'{text}\n')
+
+    def _claim(self, cursor: list[int] | None) -> None:
+        owner = self._owner
+        if owner is cursor:
+            return
+        if owner is not None:
+            owner[0] = self._sink.tell()
+        self._owner = cursor
+        if cursor is None:
+            self._sink.seek(0, SEEK_END)
+        else:
+            self._sink.seek(cursor[0])
+
+    def iter_parts(self) -> Iterator[str]:
+        if isinstance(self._sink, GeneratorType):
+            raise TypeError('parts were handed to a generator consumer')
+        return self._read_lines([0])
+
+    def _read_lines(self, cursor: list[int]) -> Iterator[str]:
+        readline = self._sink.readline
+        while True:
+            self._claim(cursor)
+            line = readline()
+            if not line:
+                return
+            yield line[:-1]
+
+    def list_parts(self, out: TextIO | None = None) -> None:
+        out = out or sys.stdout
+        parts = self.iter_parts()
+        out.write('Product parts: ')
+        separator = ''
+        for part in parts:
+            out.write(separator)
+            out.write(part)
+            separator = ', '
+        out.flush()
+
+    def close(self) -> None:
+        self._sink.close()
+
+
+class StreamingBuilder1(ConcreteBuilder1):
+    '''
+    Строитель, выпускающий StreamingProduct1. Для каждого продукта
+    sink_factory создаёт новый приёмник, по умолчанию временный файл.
+    '''
+
+    def __init__(self, sink_factory: Callable[[], Any] | None = None) -> None:
+        self._sink_factory = sink_factory or (lambda: TemporaryFile('w+'))
+        super().__init__()
+
+    def reset(self) -> None:
+        self._product = StreamingProduct1(self._sink_factory())
+
+
 class Director:
     '''
     Директор отвечает только за выполнени шагов построения в определеннрй
@@ -149,6 +329,25 @@ class Director:
         self.builder.produce_part_b()
         self.builder.produce_part_c()
 
+    def record(self, build: Callable[[Director], None]) -> Recipe:
+        '''
+        Записывает шаги, которые выполняет метод директора, в рецепт.
+        '''
+        builder = self._builder
+        recorder = _RecordingBuilder()
+        self._builder = recorder
+        try:
+            build(self)
+        finally:
+            self._builder = builder
+        return Recipe(tuple(recorder.steps))
+
+    def build_batch(self, recipe: Recipe, n: int) -> list:
+        '''
+        Производит n одинаковых продуктов по рецепту текущим строителем.
+        '''
+        return recipe.replay(self.builder, n)
+
 
 if __name__ == '__main__':
     '''
@@ -173,3 +372,26 @@ if __name__ == '__main__':
 
     print('\n')
 
+    print('Full featured products from a recorded recipe: ')
+    director.builder = PooledBuilder1()
+    recipe = director.record(Director.build_full_featured_product)
+    products = director.build_batch(recipe, 3)
+    for product in products:
+        product.list_parts()
+        print()
+        director.builder.release(product)
+    director.build_batch(recipe, 3)
+    print(f'{recipe}: created {director.builder.created}, '
+          f'reused {director.builder.reused}')
+
+    print('\n')
+
+    print('Streaming product with many parts: ')
+    streaming_builder = StreamingBuilder1()
+    for _ in range(3):
+        streaming_builder.produce_part_a().produce_part_b()
+    product = streaming_builder.product
+    product.list_parts()
+    product.close()
+    print('\n')
+
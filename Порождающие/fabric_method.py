@@ -1,5 +1,7 @@
 from __future__ import annotations
 from abc import ABC, abstractmethod
+from timeit import timeit
+from typing import Callable
 
 class Creater(ABC):
 
@@ -9,7 +11,7 @@ class Creater(ABC):
 
     def some_operation(self):
         product = self.factory_method()
-        result = f'Creator: The same Creator`s code has just worked with {product.operation}'
+        result = f'Creator: The same Creator`s code has just worked with {product.operation()}'
         return result
 
 
@@ -25,6 +27,42 @@ class Creater2(Creater):
         return Product2()
 
 
+class RegistryCreater(Creater):
+    # Продукт выбирается по ключу, а не подклассом создателя. Конструктор
+    # ищется в реестре один раз при создании создателя, дальше factory_method
+    # только вызывает его. Для продуктов без состояния можно включить reuse,
+    # тогда создатель отдаёт один и тот же экземпляр.
+
+    _constructors: dict[str, Callable[[], Product]] = {}
+
+    @classmethod
+    def register(cls, key: str) -> Callable[[type[Product]], type[Product]]:
+        def decorator(product_cls: type[Product]) -> type[Product]:
+            cls._constructors[key] = product_cls
+            return product_cls
+        return decorator
+
+    def __init__(self, key: str, reuse: bool = False) -> None:
+        try:
+            constructor = self._constructors[key]
+        except KeyError:
+            raise LookupError(f'no product registered for {key!r}') from None
+        if reuse:
+            product = None
+
+            def create():
+                nonlocal product
+                if product is None:
+                    product = constructor()
+                return product
+            self._create = create
+        else:
+            self._create = constructor
+
+    def factory_method(self) -> Product:
+        return self._create()
+
+
 class Product(ABC):
 
     @abstractmethod
@@ -32,15 +70,32 @@ class Product(ABC):
         pass
 
 
+@RegistryCreater.register('product1')
 class Product1(Product):
     def operation(self):
         return '{Result of Product1}'
 
 
+@RegistryCreater.register('product2')
 class Product2(Product):
     def operation(self):
         return '{Result of Product2}'
 
 
+def benchmark(number: int = 200_000) -> dict[str, float]:
+    creators = {
+        'subclass': Creater1(),
+        'registry': RegistryCreater('product1'),
+        'registry, reuse': RegistryCreater('product1', reuse=True),
+    }
+    return {
+        name: timeit(creator.some_operation, number=number) / number * 1e9
+        for name, creator in creators.items()
+    }
+
+
 if __name__ == '__main__':
-    Creater1
\ No newline at end of file
+    Creater1
+    print(RegistryCreater('product2').some_operation())
+    for name, ns in benchmark().items():
+        print(f'{name}: {ns:.1f} ns per operation')
\ No newline at end of file
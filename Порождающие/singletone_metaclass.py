@@ -10,21 +10,109 @@
 программе. Для этого придётся эмулировать присутствие одиночки и там. Чаще
 всего эта проблема проявляется при написании юнит-тестов.
 '''
+import asyncio
+import multiprocessing
+import os
+import pickle
 import random
-from threading import Lock, Thread
+import struct
+from multiprocessing import resource_tracker
+from multiprocessing.shared_memory import SharedMemory
+from threading import Barrier, Lock, Thread
 from time import perf_counter, sleep
 from typing import Any
 
 class SingletonMeta(type):
+    """
+    Быстрый путь обходится без блокировки: если экземпляр уже создан, он
+    просто достаётся из словаря (чтение dict атомарно под GIL). Блокировка
+    нужна только при первом создании, и у каждого класса она своя, поэтому
+    разные Одиночки не мешают друг другу. Общий _lock охраняет лишь
+    создание этих поклассовых блокировок.
+    """
     _instances = {}
+    _locks = {}
     _lock = Lock()
 
     def __call__(cls, *args, **kwargs):
-        with cls._lock:
+        try:
+            return cls._instances[cls]
+        except KeyError:
+            pass
+        with cls._class_lock():
             if cls not in cls._instances:
                 cls._instances[cls] = super().__call__(*args, **kwargs)
         return cls._instances[cls]
 
+    def _class_lock(cls) -> Lock:
+        lock = cls._locks.get(cls)
+        if lock is None:
+            with cls._lock:
+                lock = cls._locks.setdefault(cls, Lock())
+        return lock
+
+    @staticmethod
+    def _reset_after_fork() -> None:
+        '''
+        Дочерний процесс наследует блокировки в том состоянии, в котором их
+        держали потоки родителя, но самих потоков в нём уже нет. Поэтому
+        блокировки создаются заново. Готовые экземпляры сохраняются - ради них
+        и делают предварительную загрузку перед fork. Недостроенный экземпляр
+        в реестр не попадает, так что в ребёнке он просто будет создан заново.
+        '''
+        SingletonMeta._lock = Lock()
+        SingletonMeta._locks = {}
+        AsyncSingletonMeta._tasks = {}
+
+
+class AsyncSingletonMeta(SingletonMeta):
+    """
+    Одиночка с асинхронной инициализацией. Экземпляр получают через
+    `await Cls.instance(...)`: конструктор и корутина __ainit__ выполняются
+    ровно один раз, а все конкурентные вызовы ждут одну и ту же задачу, не
+    блокируя цикл событий. Если инициализация упала, следующий вызов
+    попробует снова.
+
+    Обычный вызов Cls() возвращает уже готовый экземпляр, а до
+    инициализации выбрасывает RuntimeError.
+    """
+    _tasks = {}
+
+    def __call__(cls, *args, **kwargs):
+        try:
+            return cls._instances[cls]
+        except KeyError:
+            raise RuntimeError(
+                f'{cls.__name__} is not initialized, '
+                f'use "await {cls.__name__}.instance()"'
+            ) from None
+
+    async def instance(cls, *args, **kwargs):
+        try:
+            return cls._instances[cls]
+        except KeyError:
+            pass
+        task = cls._tasks.get(cls)
+        if task is None:
+            task = asyncio.ensure_future(cls._create(*args, **kwargs))
+            cls._tasks[cls] = task
+        # shield: отмена одного ожидающего не должна отменять инициализацию
+        # для остальных.
+        return await asyncio.shield(task)
+
+    async def _create(cls, *args, **kwargs):
+        try:
+            obj = type.__call__(cls, *args, **kwargs)
+            await obj.__ainit__()
+            cls._instances[cls] = obj
+            return obj
+        finally:
+            cls._tasks.pop(cls, None)
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=SingletonMeta._reset_after_fork)
+
 class Singleton(metaclass=SingletonMeta):
 
     def __init__(self, __value, /):
@@ -33,24 +121,193 @@ class Singleton(metaclass=SingletonMeta):
     def some_business_logic(self):
         ...
 
+class AsyncSingleton(metaclass=AsyncSingletonMeta):
+
+    def __init__(self, __value, /):
+        self.value = __value
+        self.ready = False
+
+    async def __ainit__(self):
+        await asyncio.sleep(0.1)
+        self.ready = True
+
+
+class SharedStateSingleton(metaclass=SingletonMeta):
+    """
+    Одиночка, чьё состояние лежит в разделяемой памяти и одно на все
+    процессы. Процесс-владелец создаёт сегмент (create=True), остальные
+    подключаются к нему по имени и читают данные через memoryview без
+    копирования.
+
+    Сегмент разбит на заголовок и два слота. Писатель публикует новую
+    версию в неактивный слот, а затем переключает заголовок под счётчиком
+    последовательности (seqlock): пока счётчик нечётный, читатели повторяют
+    попытку. Так читатель никогда не видит наполовину записанную версию.
+    Представление из view() указывает прямо в сегмент, поэтому следующая
+    публикация может его перезаписать: прочитав данные, проверьте
+    is_current(version) и при False прочитайте заново.
+    """
+
+    _HEADER = struct.Struct('<QQQQ')  # seq, version, slot, length
+
+    def __init__(self, name: str, capacity: int = 1 << 20,
+                 create: bool = False) -> None:
+        size = self._HEADER.size + 2 * capacity
+        if create:
+            self._shm = SharedMemory(name, create=True, size=size)
+            self._HEADER.pack_into(self._shm.buf, 0, 0, 0, 0, 0)
+        else:
+            # Подключившийся процесс не владеет сегментом и не должен
+            # удалять его при выходе. До Python 3.13 (нет параметра track)
+            # сегмент приходится снимать с учёта resource_tracker вручную.
+            try:
+                self._shm = SharedMemory(name, track=False)
+            except TypeError:
+                self._shm = SharedMemory(name)
+                resource_tracker.unregister(self._shm._name, 'shared_memory')
+        self.name = name
+        self.capacity = (self._shm.size - self._HEADER.size) // 2
+        self._owner = create
+        self._cached_version = -1
+        self._cached_value = None
+
+    def _slot_offset(self, slot: int) -> int:
+        return self._HEADER.size + slot * self.capacity
+
+    def publish(self, data: bytes | memoryview) -> int:
+        '''
+        Атомарно публикует новую версию состояния. Писатель должен быть один.
+        '''
+        buf = self._shm.buf
+        length = len(data)
+        if length > self.capacity:
+            raise ValueError(f'state of {length} bytes exceeds capacity '
+                             f'{self.capacity}')
+        seq, version, slot, _ = self._HEADER.unpack_from(buf, 0)
+        target = 1 - slot if version else 0
+        offset = self._slot_offset(target)
+        buf[offset:offset + length] = data
+        struct.pack_into('<Q', buf, 0, seq + 1)
+        self._HEADER.pack_into(buf, 0, seq + 1, version + 1, target, length)
+        struct.pack_into('<Q', buf, 0, seq + 2)
+        return version + 1
+
+    def publish_object(self, value: Any) -> int:
+        return self.publish(pickle.dumps(value, pickle.HIGHEST_PROTOCOL))
+
+    def view(self) -> tuple[int, memoryview]:
+        '''
+        Возвращает (версия, memoryview) текущего состояния без копирования.
+        '''
+        buf = self._shm.buf
+        while True:
+            seq, version, slot, length = self._HEADER.unpack_from(buf, 0)
+            if seq % 2:
+                continue
+            if struct.unpack_from('<Q', buf, 0)[0] == seq:
+                offset = self._slot_offset(slot)
+                return version, buf[offset:offset + length]
+
+    @property
+    def version(self) -> int:
+        return self.view()[0]
+
+    def is_current(self, version: int) -> bool:
+        return self.version == version
+
+    def value(self) -> Any:
+        '''
+        Десериализует состояние, опубликованное через publish_object. Объект
+        кэшируется, поэтому каждый процесс разбирает каждую версию один раз.
+        Если во время разбора слот перезаписали, данные могли оказаться
+        рваными: ошибка разбора тогда означает лишь, что нужно прочитать
+        заново.
+        '''
+        while True:
+            version, data = self.view()
+            if version == self._cached_version:
+                return self._cached_value
+            try:
+                value = pickle.loads(data) if version else None
+            except Exception:
+                if self.is_current(version):
+                    raise
+                continue
+            if self.is_current(version):
+                self._cached_value = value
+                self._cached_version = version
+                return value
+
+    def close(self) -> None:
+        self._shm.close()
+        if self._owner:
+            # Дочерние процессы делят трекер с владельцем и могли снять
+            # сегмент с учёта; регистрируем заново, чтобы unlink() снял его
+            # ровно один раз.
+            resource_tracker.register(self._shm._name, 'shared_memory')
+            self._shm.unlink()
+
+
+def read_shared_state(name: str) -> None:
+    state = SharedStateSingleton(name)
+    print(f'Worker {os.getpid()}: version {state.version}, {state.value()}')
+
+
+async def test_async_singleton():
+    instances = await asyncio.gather(
+        *(AsyncSingleton.instance(value) for value in '1234')
+    )
+    print({id(instance) for instance in instances} == {id(AsyncSingleton())},
+          instances[0].value, instances[0].ready)
+
+
 def test_singleton(__value, /):
     sleep(random.randint(0, 2))
     s = Singleton(__value)
     print(s.value)
 
-def main():
-    p3 = Thread(target=test_singleton, args=('3',))
-    p2 = Thread(target=test_singleton, args=('2',))
-    p1 = Thread(target=test_singleton, args=('1',))
-    p4 = Thread(target=test_singleton, args=('4',))
-    p4.start()
-    p2.start()
-    p3.start()
-    p1.start()
+def main(threads: int = 8, calls: int = 100_000) -> float:
+    """
+    Бенчмарк конкуренции: несколько потоков одновременно и много раз
+    запрашивают Одиночку. Возвращает число вызовов в секунду по всем потокам.
+    """
+    start = Barrier(threads + 1)
+
+    def worker():
+        start.wait()
+        for _ in range(calls):
+            Singleton('bench')
+
+    workers = [Thread(target=worker) for _ in range(threads)]
+    for worker_thread in workers:
+        worker_thread.start()
+    start.wait()
+    t0 = perf_counter()
+    for worker_thread in workers:
+        worker_thread.join()
+    return threads * calls / (perf_counter() - t0)
+
 
 if __name__ == '__main__':
-    while True:
-        t0 = perf_counter()
-        main()
-        print(perf_counter() - t0)
-        sleep(1)
\ No newline at end of file
+    demo = [Thread(target=test_singleton, args=(value,))
+            for value in ('4', '2', '3', '1')]
+    for thread in demo:
+        thread.start()
+    for thread in demo:
+        thread.join()
+
+    asyncio.run(test_async_singleton())
+
+    shared = SharedStateSingleton(f'singleton-{os.getpid()}', create=True)
+    shared.publish_object({'config': 'v1', 'lookup': list(range(5))})
+    spawn = multiprocessing.get_context('spawn')
+    workers = [spawn.Process(target=read_shared_state, args=(shared.name,))
+               for _ in range(2)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    shared.close()
+
+    for threads in (1, 2, 4, 8, 16):
+        print(f'{threads:>2} threads: {main(threads):,.0f} calls/s')
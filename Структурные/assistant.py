@@ -17,7 +17,18 @@
 жизненным циклом своего реального объекта.
 '''
 
+import os
+import pickle
 from abc import ABC, abstractmethod
+from collections import OrderedDict, deque
+from concurrent.futures import Future
+from itertools import count
+from multiprocessing import AuthenticationError, Process
+from multiprocessing.connection import Client, Connection, Listener
+from queue import Empty, SimpleQueue
+from threading import Condition, Event, Lock, Thread
+from time import monotonic, time
+from typing import Any, Callable, Hashable, TextIO
 
 
 class Subject(ABC):
@@ -73,6 +84,667 @@ class Proxy(Subject):
         print('Proxy: logging the time of request.', end='')
 
 
+class VirtualProxy(Proxy):
+    """
+    Виртуальный Заместитель откладывает создание тяжёлого Реального Субъекта
+    до первого запроса. Вместо готового объекта он получает фабрику и
+    вызывает её ровно один раз, даже если первые запросы пришли одновременно
+    из нескольких потоков.
+
+    Если фабрика упала, субъект остаётся несозданным и следующий запрос
+    попробует ещё раз.
+    """
+
+    def __init__(self, factory: Callable[[], RealSubject]) -> None:
+        self._factory = factory
+        self._real_subject = None
+        self._init_lock = Lock()
+        self._ready = Event()
+
+    @property
+    def initialized(self) -> bool:
+        return self._ready.is_set()
+
+    @property
+    def real_subject(self) -> RealSubject:
+        # Быстрый путь без блокировки: после инициализации ссылка не меняется.
+        if self._ready.is_set():
+            return self._real_subject
+        with self._init_lock:
+            if not self._ready.is_set():
+                self._real_subject = self._factory()
+                self._ready.set()
+        return self._real_subject
+
+    def prewarm(self, background: bool = True) -> Thread | None:
+        '''
+        Создаёт Реальный Субъект заранее. В фоновом режиме возвращает поток,
+        чтобы при желании можно было дождаться окончания прогрева.
+        '''
+        if not background:
+            self.real_subject
+            return None
+        thread = Thread(target=lambda: self.real_subject, daemon=True)
+        thread.start()
+        return thread
+
+    def request(self, *args, **kwargs) -> Any:
+        if self.check_access():
+            result = self.real_subject.request(*args, **kwargs)
+            self.log_access()
+            return result
+        return None
+
+
+class CachingProxy(Proxy):
+    """
+    Кэширующий Заместитель запоминает результаты Реального Субъекта по
+    аргументам запроса. Повторный запрос с теми же аргументами обслуживается
+    из кэша, пока запись не устарела (ttl) и не была вытеснена (maxsize).
+
+    Записи вытесняются в порядке LRU. Кэш можно сбросить явно целиком или по
+    конкретным аргументам, а также по предикату от ключа.
+    """
+
+    _MISSING = object()
+
+    def __init__(self, real_subject: RealSubject, ttl: float | None = None,
+                 maxsize: int | None = 128,
+                 clock: Callable[[], float] = monotonic) -> None:
+        super().__init__(real_subject)
+        self._ttl = ttl
+        self._maxsize = maxsize
+        self._clock = clock
+        self._cache: OrderedDict[Hashable, tuple[float, Any]] = OrderedDict()
+        self._lock = Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def make_key(*args, **kwargs) -> Hashable:
+        if not kwargs:
+            return args
+        return args + (CachingProxy._MISSING,) + tuple(sorted(kwargs.items()))
+
+    def request(self, *args, **kwargs) -> Any:
+        if not self.check_access():
+            return None
+        key = self.make_key(*args, **kwargs)
+        result = self._lookup(key)
+        if result is self._MISSING:
+            result = self._real_subject.request(*args, **kwargs)
+            self._store(key, result)
+            self.log_access()
+        return result
+
+    def _lookup(self, key: Hashable) -> Any:
+        with self._lock:
+            entry = self._cache.get(key)
+            if entry is not None:
+                expires, value = entry
+                if expires >= self._clock():
+                    self._cache.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._cache[key]
+            self.misses += 1
+            return self._MISSING
+
+    def _store(self, key: Hashable, value: Any) -> None:
+        expires = float('inf') if self._ttl is None else self._clock() + self._ttl
+        with self._lock:
+            self._cache[key] = (expires, value)
+            self._cache.move_to_end(key)
+            if self._maxsize is not None:
+                while len(self._cache) > self._maxsize:
+                    self._cache.popitem(last=False)
+
+    def invalidate(self, *args, **kwargs) -> bool:
+        '''
+        Сбрасывает запись для конкретных аргументов запроса.
+        '''
+        with self._lock:
+            return self._cache.pop(self.make_key(*args, **kwargs),
+                                   None) is not None
+
+    def invalidate_where(self, predicate: Callable[[Hashable], bool]) -> int:
+        '''
+        Сбрасывает все записи, ключи которых удовлетворяют предикату.
+        '''
+        with self._lock:
+            stale = [key for key in self._cache if predicate(key)]
+            for key in stale:
+                del self._cache[key]
+        return len(stale)
+
+    def invalidate_all(self) -> None:
+        with self._lock:
+            self._cache.clear()
+
+    @property
+    def calls_avoided(self) -> int:
+        return self.hits
+
+    def stats(self) -> dict[str, Any]:
+        total = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'calls_avoided': self.hits,
+            'hit_ratio': self.hits / total if total else 0.0,
+            'size': len(self._cache),
+        }
+
+
+class TokenBucket:
+    """
+    Ограничитель частоты по алгоритму «ведро с жетонами». Жетоны
+    восполняются со скоростью rate в секунду, но не больше capacity. Потоки
+    получают жетоны строго в порядке очереди, поэтому ни один из них не
+    голодает.
+    """
+
+    def __init__(self, rate: float, capacity: int = 1,
+                 clock: Callable[[], float] = monotonic) -> None:
+        if rate <= 0 or capacity < 1:
+            raise ValueError('rate must be positive and capacity at least 1')
+        self._rate = rate
+        self._capacity = capacity
+        self._clock = clock
+        self._tokens = float(capacity)
+        self._updated = clock()
+        self._cond = Condition()
+        self._next_ticket = 0
+        self._serving = 0
+
+    def _refill(self) -> None:
+        now = self._clock()
+        self._tokens = min(self._capacity,
+                           self._tokens + (now - self._updated) * self._rate)
+        self._updated = now
+
+    def acquire(self) -> None:
+        with self._cond:
+            ticket = self._next_ticket
+            self._next_ticket += 1
+            while ticket != self._serving:
+                self._cond.wait()
+            while True:
+                self._refill()
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    break
+                self._cond.wait((1 - self._tokens) / self._rate)
+            self._serving += 1
+            self._cond.notify_all()
+
+
+class _InFlightCall:
+
+    __slots__ = ('done', 'result', 'error')
+
+    def __init__(self) -> None:
+        self.done = Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlightProxy(Proxy):
+    """
+    Заместитель, защищающий Реальный Субъект от «грохочущего стада».
+    Одновременные запросы с одинаковыми аргументами склеиваются: до субъекта
+    доходит только первый, а остальные ждут и получают его результат (или
+    его исключение).
+
+    Дополнительно можно ограничить частоту обращений к субъекту с помощью
+    TokenBucket. Ограничение применяется только к реальным вызовам, поэтому
+    склеенные запросы не тратят жетоны.
+    """
+
+    def __init__(self, real_subject: RealSubject,
+                 limiter: TokenBucket | None = None) -> None:
+        super().__init__(real_subject)
+        self._limiter = limiter
+        self._in_flight: dict[Hashable, _InFlightCall] = {}
+        self._lock = Lock()
+        self.calls = 0
+        self.coalesced = 0
+
+    def request(self, *args, **kwargs) -> Any:
+        if not self.check_access():
+            return None
+        key = CachingProxy.make_key(*args, **kwargs)
+        with self._lock:
+            call = self._in_flight.get(key)
+            leader = call is None
+            if leader:
+                call = self._in_flight[key] = _InFlightCall()
+                self.calls += 1
+            else:
+                self.coalesced += 1
+
+        if leader:
+            try:
+                if self._limiter is not None:
+                    self._limiter.acquire()
+                call.result = self._real_subject.request(*args, **kwargs)
+            except BaseException as error:
+                call.error = error
+            finally:
+                with self._lock:
+                    del self._in_flight[key]
+                call.done.set()
+            self.log_access()
+        else:
+            call.done.wait()
+
+        if call.error is not None:
+            raise call.error
+        return call.result
+
+
+class RemoteSubjectServer:
+    """
+    Сервер, который держит Реальный Субъект в отдельном процессе (или, для
+    проверок, в отдельном потоке текущего процесса). Каждый кадр от клиента -
+    это пачка запросов [(id, args, kwargs), ...], в ответ уходит пачка
+    [(id, ok, pickle значения), ...] в том же порядке. Значения сериализуются
+    по отдельности, чтобы ошибка одного ответа не портила весь кадр.
+    """
+
+    def __init__(self, factory: Callable[[], Subject], address: Any = None,
+                 authkey: bytes | None = None) -> None:
+        self._factory = factory
+        self._listener = Listener(address, authkey=authkey)
+        self.address = self._listener.address
+
+    def serve_forever(self) -> None:
+        subject = self._factory()
+        while True:
+            try:
+                conn = self._listener.accept()
+            except (AuthenticationError, EOFError, ConnectionError):
+                # Клиент не прошёл рукопожатие - обслуживаем остальных.
+                continue
+            except OSError:
+                return
+            Thread(target=self._serve_connection, args=(subject, conn),
+                   daemon=True).start()
+
+    @staticmethod
+    def _serve_connection(subject: Subject, conn: Connection) -> None:
+        with conn:
+            while True:
+                try:
+                    frame = conn.recv()
+                except (EOFError, OSError):
+                    return
+                replies = []
+                for request_id, args, kwargs in frame:
+                    try:
+                        ok, value = True, subject.request(*args, **kwargs)
+                    except Exception as error:
+                        ok, value = False, error
+                    replies.append(RemoteSubjectServer._encode(
+                        request_id, ok, value))
+                try:
+                    conn.send(replies)
+                except (EOFError, OSError):
+                    return
+
+    @staticmethod
+    def _encode(request_id: int, ok: bool,
+                value: Any) -> tuple[int, bool, bytes]:
+        # Результат или исключение, которое не сериализуется, заменяется
+        # ошибкой.
+        try:
+            return (request_id, ok, pickle.dumps(value))
+        except Exception as error:
+            return (request_id, False, pickle.dumps(RuntimeError(
+                f'unpicklable {"result" if ok else "exception"} '
+                f'{value!r}: {error}'
+            )))
+
+    def start(self) -> Thread:
+        '''
+        Запускает сервер в фоновом потоке - удобно как локальная заглушка.
+        '''
+        thread = Thread(target=self.serve_forever, daemon=True)
+        thread.start()
+        return thread
+
+    def spawn(self) -> Process:
+        '''
+        Запускает сервер в дочернем процессе, чтобы субъект работал на
+        другом ядре.
+        '''
+        process = Process(target=self.serve_forever, daemon=True)
+        process.start()
+        return process
+
+    def close(self) -> None:
+        self._listener.close()
+
+
+class RemoteProxy(Proxy):
+    """
+    Удалённый Заместитель обращается к Реальному Субъекту из другого
+    процесса через Unix-сокет или соединение multiprocessing.
+
+    Прокси держит пул соединений. Запросы не ждут ответов на предыдущие
+    (конвейер): каждое соединение читает ответы в своём потоке и разрешает
+    соответствующие Future. Мелкие запросы, пришедшие в пределах
+    batch_window секунд, склеиваются в один кадр размером до max_batch.
+
+    Если кадр не удалось отправить (например, аргумент не сериализуется),
+    ошибку получают только запросы этого кадра, а если не удалось прочитать
+    один ответ - только его запрос. Если соединение оборвалось, ошибку
+    получают запросы, отправленные через него, а новые кадры идут по
+    оставшимся соединениям; когда живых не осталось, запросы сразу получают
+    ConnectionError. timeout ограничивает ожидание ответа в request() и
+    request_many(), connect_timeout - подключение вместе с рукопожатием.
+    """
+
+    _STOP = object()
+
+    def __init__(self, address: Any, authkey: bytes | None = None,
+                 pool_size: int = 2, max_batch: int = 64,
+                 batch_window: float = 0.001,
+                 timeout: float | None = None,
+                 connect_timeout: float | None = 5.0) -> None:
+        self._connections: list[Connection] = []
+        try:
+            for _ in range(pool_size):
+                self._connections.append(
+                    self._connect(address, authkey, connect_timeout))
+        except BaseException:
+            for conn in self._connections:
+                conn.close()
+            raise
+        self._send_locks = [Lock() for _ in self._connections]
+        self._alive = [True for _ in self._connections]
+        self._max_batch = max_batch
+        self._batch_window = batch_window
+        self._timeout = timeout
+        self._ids = count()
+        self._pending: dict[int, Future] = {}
+        self._in_flight: list[set[int]] = [set() for _ in self._connections]
+        self._pending_lock = Lock()
+        self._outbox: SimpleQueue = SimpleQueue()
+        self._closed = False
+        self.frames_sent = 0
+        self._readers = [
+            Thread(target=self._read_replies, args=(index,), daemon=True)
+            for index in range(len(self._connections))
+        ]
+        for reader in self._readers:
+            reader.start()
+        self._batcher = Thread(target=self._send_batches, daemon=True)
+        self._batcher.start()
+
+    @staticmethod
+    def _connect(address: Any, authkey: bytes | None,
+                 timeout: float | None) -> Connection:
+        '''
+        Client() не умеет таймаут, поэтому подключение идёт в отдельном
+        потоке. Если оно не уложилось в timeout, соединение, которое всё же
+        установится позже, закрывается.
+        '''
+        future: Future = Future()
+
+        def connect() -> None:
+            try:
+                future.set_result(Client(address, authkey=authkey))
+            except BaseException as error:
+                future.set_exception(error)
+
+        Thread(target=connect, daemon=True).start()
+        try:
+            return future.result(timeout=timeout)
+        except TimeoutError:
+            future.add_done_callback(
+                lambda done: done.exception() or done.result().close())
+            raise TimeoutError(
+                f'could not connect to remote subject at {address!r} '
+                f'within {timeout} s'
+            ) from None
+
+    def request_async(self, *args, **kwargs) -> Future:
+        if self._closed:
+            raise RuntimeError('RemoteProxy is closed')
+        future: Future = Future()
+        request_id = next(self._ids)
+        with self._pending_lock:
+            self._pending[request_id] = future
+        self._outbox.put((request_id, args, kwargs))
+        return future
+
+    def _wait(self, future: Future, deadline: float | None) -> Any:
+        timeout = None if deadline is None else max(deadline - monotonic(), 0)
+        try:
+            return future.result(timeout=timeout)
+        except TimeoutError:
+            with self._pending_lock:
+                for request_id, pending in list(self._pending.items()):
+                    if pending is future:
+                        del self._pending[request_id]
+            raise
+
+    def _deadline(self) -> float | None:
+        return None if self._timeout is None else monotonic() + self._timeout
+
+    def request(self, *args, **kwargs) -> Any:
+        if self.check_access():
+            future = self.request_async(*args, **kwargs)
+            result = self._wait(future, self._deadline())
+            self.log_access()
+            return result
+        return None
+
+    def request_many(self, calls: list[tuple[tuple, dict]]) -> list[Any]:
+        '''
+        Отправляет пачку запросов сразу и ждёт все ответы.
+        '''
+        deadline = self._deadline()
+        futures = [self.request_async(*args, **kwargs) for args, kwargs in calls]
+        return [self._wait(future, deadline) for future in futures]
+
+    def _send_batches(self) -> None:
+        for slot in count():
+            item = self._outbox.get()
+            if item is self._STOP:
+                return
+            frame = [item]
+            deadline = monotonic() + self._batch_window
+            while len(frame) < self._max_batch:
+                timeout = deadline - monotonic()
+                try:
+                    item = self._outbox.get(timeout=max(timeout, 0))
+                except Empty:
+                    break
+                if item is self._STOP:
+                    self._outbox.put(item)
+                    break
+                frame.append(item)
+            request_ids = [request_id for request_id, _, _ in frame]
+            index = self._route(slot, request_ids)
+            if index is None:
+                self._fail(request_ids, ConnectionError(
+                    'no live connections to remote subject'))
+                continue
+            in_flight = self._in_flight[index]
+            try:
+                with self._send_locks[index]:
+                    self._connections[index].send(frame)
+                self.frames_sent += 1
+            except (EOFError, OSError) as error:
+                # Соединение мертво: ответов на отправленное через него уже
+                # не будет, а новые кадры пойдут по другим соединениям.
+                with self._pending_lock:
+                    self._alive[index] = False
+                    lost = list(in_flight)
+                    in_flight.clear()
+                self._fail(lost, ConnectionError(
+                    f'connection to remote subject lost: {error!r}'
+                ))
+            except Exception as error:
+                with self._pending_lock:
+                    in_flight.difference_update(request_ids)
+                self._fail(request_ids, error)
+
+    def _route(self, slot: int, request_ids: list[int]) -> int | None:
+        # Ищет живое соединение по кругу, начиная со slot, и под той же
+        # блокировкой, что и читатель, записывает на него запросы кадра.
+        total = len(self._connections)
+        with self._pending_lock:
+            for offset in range(total):
+                index = (slot + offset) % total
+                if self._alive[index]:
+                    self._in_flight[index].update(request_ids)
+                    return index
+        return None
+
+    def _read_replies(self, index: int) -> None:
+        conn = self._connections[index]
+        in_flight = self._in_flight[index]
+        while True:
+            try:
+                replies = conn.recv()
+            except Exception as error:
+                with self._pending_lock:
+                    self._alive[index] = False
+                    request_ids = list(in_flight)
+                    in_flight.clear()
+                self._fail(request_ids, ConnectionError(
+                    f'connection to remote subject lost: {error!r}'
+                ))
+                return
+            for request_id, ok, payload in replies:
+                with self._pending_lock:
+                    in_flight.discard(request_id)
+                    future = self._pending.pop(request_id, None)
+                if future is None:
+                    continue
+                try:
+                    value = pickle.loads(payload)
+                except Exception as error:
+                    future.set_exception(RuntimeError(
+                        f'cannot decode reply from remote subject: {error!r}'
+                    ))
+                    continue
+                if ok:
+                    future.set_result(value)
+                else:
+                    future.set_exception(value)
+
+    def _fail(self, request_ids: list[int], error: BaseException) -> None:
+        for request_id in request_ids:
+            with self._pending_lock:
+                future = self._pending.pop(request_id, None)
+            if future is not None:
+                future.set_exception(error)
+
+    def close(self) -> None:
+        if self._closed:
+            return
+        self._closed = True
+        self._outbox.put(self._STOP)
+        self._batcher.join()
+        for conn in self._connections:
+            conn.close()
+        with self._pending_lock:
+            request_ids = list(self._pending)
+        self._fail(request_ids, ConnectionError('RemoteProxy closed'))
+
+    def __enter__(self) -> 'RemoteProxy':
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+class AsyncLoggingProxy(Proxy):
+    """
+    Заместитель, который убирает проверку доступа и журналирование с пути
+    запроса.
+
+    Записи журнала складываются в кольцевой буфер (deque с maxlen: append и
+    popleft атомарны под GIL, поэтому блокировка не нужна), а фоновый поток
+    раз в flush_interval секунд сбрасывает их в файл одной пачкой. При
+    переполнении буфера теряются самые старые записи.
+
+    Решения о доступе кэшируются для каждого субъекта доступа (principal)
+    на access_ttl секунд.
+    """
+
+    def __init__(self, real_subject: RealSubject, log_file: TextIO,
+                 access_policy: Callable[[Hashable], bool] = lambda _: True,
+                 access_ttl: float = 30.0, buffer_size: int = 65536,
+                 flush_interval: float = 0.5) -> None:
+        super().__init__(real_subject)
+        self._log_file = log_file
+        self._access_policy = access_policy
+        self._access_ttl = access_ttl
+        self._access_cache: dict[Hashable, tuple[float, bool]] = {}
+        self._buffer: deque = deque(maxlen=buffer_size)
+        self._flush_interval = flush_interval
+        self._stopped = Event()
+        self.records_written = 0
+        self._writer = Thread(target=self._write_loop, daemon=True)
+        self._writer.start()
+
+    def request(self, *args, principal: Hashable = None, **kwargs) -> Any:
+        if self.check_access(principal):
+            result = self._real_subject.request(*args, **kwargs)
+            self.log_access(principal)
+            return result
+        return None
+
+    def check_access(self, principal: Hashable = None) -> bool:
+        now = monotonic()
+        cached = self._access_cache.get(principal)
+        if cached is not None and cached[0] > now:
+            return cached[1]
+        allowed = bool(self._access_policy(principal))
+        self._access_cache[principal] = (now + self._access_ttl, allowed)
+        return allowed
+
+    def forget_access(self, principal: Hashable = None) -> None:
+        self._access_cache.pop(principal, None)
+
+    def log_access(self, principal: Hashable = None) -> None:
+        self._buffer.append((time(), principal))
+
+    def flush(self) -> int:
+        '''
+        Забирает всё накопленное из буфера и пишет в файл одним вызовом.
+        '''
+        batch = []
+        buffer = self._buffer
+        while True:
+            try:
+                batch.append(buffer.popleft())
+            except IndexError:
+                break
+        if batch:
+            self._log_file.write(''.join(
+                f'{timestamp:.6f}\t{principal}\trequest\n'
+                for timestamp, principal in batch
+            ))
+            self._log_file.flush()
+            self.records_written += len(batch)
+        return len(batch)
+
+    def _write_loop(self) -> None:
+        while not self._stopped.wait(self._flush_interval):
+            self.flush()
+
+    def close(self) -> None:
+        self._stopped.set()
+        self._writer.join()
+        self.flush()
+
+
 def client_code(subject: Subject):
     subject.request()
 
@@ -86,3 +758,57 @@ if __name__ == '__main__':
     print('Client: Executing the code with a real subject:')
     proxy = Proxy(real_subject)
     client_code(proxy)
+
+    print('\n')
+
+    print('Client: Executing the same request several times via caching proxy:')
+    caching_proxy = CachingProxy(real_subject, ttl=60)
+    for _ in range(3):
+        client_code(caching_proxy)
+        print('')
+    print(f'Client: {caching_proxy.stats()}')
+
+    print('')
+
+    print('Client: Executing the code with a lazily created subject:')
+    virtual_proxy = VirtualProxy(RealSubject)
+    print(f'Client: subject created before request: {virtual_proxy.initialized}')
+    client_code(virtual_proxy)
+    print('')
+    print(f'Client: subject created after request: {virtual_proxy.initialized}')
+
+    print('')
+
+    print('Client: Firing concurrent identical requests via single-flight proxy:')
+    single_flight = SingleFlightProxy(real_subject, TokenBucket(rate=10))
+    threads = [Thread(target=client_code, args=(single_flight,))
+               for _ in range(5)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    print('')
+    print(f'Client: real calls: {single_flight.calls}, '
+          f'coalesced: {single_flight.coalesced}')
+
+    print('')
+
+    print('Client: Executing the code with a subject in another process:')
+    server = RemoteSubjectServer(RealSubject)
+    server.spawn()
+    with RemoteProxy(server.address) as remote_proxy:
+        client_code(remote_proxy)
+        remote_proxy.request_many([((), {})] * 10)
+        print('')
+        print(f'Client: frames sent: {remote_proxy.frames_sent}')
+    server.close()
+
+    print('')
+
+    print('Client: Executing the code with asynchronous access logging:')
+    with open(os.devnull, 'w') as log_file:
+        logging_proxy = AsyncLoggingProxy(real_subject, log_file)
+        for _ in range(3):
+            logging_proxy.request(principal='client')
+        logging_proxy.close()
+    print(f'Client: log records written: {logging_proxy.records_written}')
@@ -21,6 +21,14 @@
 from __future__ import annotations
 from abc import ABC, abstractmethod
 from sys import implementation
+from concurrent.futures import (FIRST_COMPLETED, Future, ThreadPoolExecutor,
+                                wait)
+from threading import BoundedSemaphore
+from pathlib import Path
+from time import monotonic
+from timeit import Timer
+from typing import Callable
+import json
 
 
 class Abstraction:
@@ -33,6 +41,13 @@ class Abstraction:
     def __init__(self, implementation: Implementation) -> None:
         self.implementation = implementation
 
+    @classmethod
+    def from_registry(cls, registry: ImplementationRegistry) -> Abstraction:
+        '''
+        Связывает Абстракцию с самой быстрой из зарегистрированных Реализаций.
+        '''
+        return cls(registry.fastest()())
+
     def operation(self):
         return (f'Abstraction: Base operation with:\n'
                 f'{self.implementation.operation()}')
@@ -45,6 +60,129 @@ class ExtendedAbstraction(Abstraction):
         return (f'ExtendedAbstraction: Base operation with:\n'
                 f'{self.implementation.operation()}')
 
+class FanOutAbstraction(Abstraction):
+    """
+    Абстракция, которая выполняет операцию сразу на нескольких Реализациях
+    параллельно.
+
+    В режиме 'first' возвращается первый успешный результат (хеджированные
+    запросы): медленная платформа больше не определяет задержку. В режиме
+    'all' дожидаются все Реализации - например, для репликации записи.
+    Для каждой Реализации можно задать свой таймаут.
+
+    У каждой Реализации свой пул из max_in_flight потоков. Реализация,
+    которую перестали ждать (проигравшая гонку или не успевшая к таймауту),
+    дорабатывает в фоне в своём пуле и не задерживает остальные. Если у
+    Реализации уже max_in_flight незавершённых вызовов (например, она
+    зависла), новый вызов к ней не ставится в очередь, а сразу считается
+    неудачным с RuntimeError. Так зависшая Реализация занимает не больше
+    max_in_flight потоков.
+    """
+
+    def __init__(self, implementations: list[Implementation],
+                 mode: str = 'first',
+                 timeouts: float | dict[Implementation, float] | None = None,
+                 max_in_flight: int = 4) -> None:
+        if not implementations:
+            raise ValueError('at least one implementation is required')
+        if mode not in ('first', 'all'):
+            raise ValueError(f'unknown fan-out mode: {mode!r}')
+        super().__init__(implementations[0])
+        self.implementations = implementations
+        self.mode = mode
+        self._timeouts = timeouts
+        self.max_in_flight = max_in_flight
+        self._lanes = [
+            (ThreadPoolExecutor(
+                max_workers=max_in_flight,
+                thread_name_prefix=f'fan-out-{type(impl).__name__}',
+            ), BoundedSemaphore(max_in_flight))
+            for impl in implementations
+        ]
+
+    def _timeout(self, implementation: Implementation) -> float | None:
+        if isinstance(self._timeouts, dict):
+            return self._timeouts.get(implementation)
+        return self._timeouts
+
+    def _submit(self) -> dict[Future, Implementation]:
+        futures = {}
+        for impl, (executor, slots) in zip(self.implementations, self._lanes):
+            if slots.acquire(blocking=False):
+                future = executor.submit(impl.operation)
+                future.add_done_callback(lambda _, slots=slots: slots.release())
+            else:
+                future = Future()
+                future.set_exception(RuntimeError(
+                    f'{type(impl).__name__}: {self.max_in_flight} calls '
+                    f'already in flight'
+                ))
+            futures[future] = impl
+        return futures
+
+    def gather(self) -> list[object]:
+        '''
+        Возвращает результаты всех Реализаций в исходном порядке. Вместо
+        результата упавшей или не успевшей Реализации возвращается исключение.
+        '''
+        started = monotonic()
+        futures = self._submit()
+        results = []
+        for future, impl in futures.items():
+            timeout = self._timeout(impl)
+            if timeout is not None:
+                timeout = max(timeout - (monotonic() - started), 0)
+            try:
+                results.append(future.result(timeout=timeout))
+            except Exception as error:
+                future.cancel()
+                results.append(error)
+        return results
+
+    def first(self) -> object:
+        '''
+        Возвращает первый успешный результат. Реализация, которая не
+        уложилась в свой таймаут, больше не ждётся.
+        '''
+        started = monotonic()
+        pending = self._submit()
+        errors = []
+        while pending:
+            deadlines = [started + t for t in map(self._timeout, pending.values())
+                         if t is not None]
+            # Просыпаемся к ближайшему таймауту, чтобы снять опоздавших.
+            timeout = None
+            if deadlines:
+                timeout = max(min(deadlines) - monotonic(), 0)
+            done, _ = wait(pending, timeout=timeout,
+                           return_when=FIRST_COMPLETED)
+            for future in done:
+                pending.pop(future)
+                if future.exception() is None:
+                    for other in pending:
+                        other.cancel()
+                    return future.result()
+                errors.append(future.exception())
+            now = monotonic()
+            for future, impl in list(pending.items()):
+                timeout = self._timeout(impl)
+                if timeout is not None and started + timeout <= now:
+                    future.cancel()
+                    del pending[future]
+                    errors.append(TimeoutError(type(impl).__name__))
+        raise RuntimeError('all implementations failed', errors)
+
+    def operation(self):
+        if self.mode == 'all':
+            results = '\n'.join(map(str, self.gather()))
+            return f'FanOutAbstraction: Base operation with:\n{results}'
+        return f'FanOutAbstraction: Base operation with:\n{self.first()}'
+
+    def close(self) -> None:
+        for executor, _ in self._lanes:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+
 class Implementation(ABC):
     """
     Реализация устанавливает интерфейс для всех классов реализации. Он не должен
@@ -73,6 +211,86 @@ class ConcreteImplementationB(Implementation):
     def operation(self):
         return 'ConcreteImplementationB: here`s the result on the platfrom B'
 
+def run_operation(implementation: Implementation) -> object:
+    return implementation.operation()
+
+
+class ImplementationRegistry:
+    """
+    Реестр Реализаций, который сам выбирает самую быструю из них. Каждая
+    Реализация прогоняется на представительной нагрузке (workload), а имя
+    победителя сохраняется в JSON-файл, чтобы при следующих запусках не
+    замерять заново. Сохранённый выбор считается устаревшим, если поменялся
+    набор зарегистрированных Реализаций или имя нагрузки.
+    """
+
+    def __init__(self, cache_path: str | Path | None = None,
+                 workload: Callable[[Implementation], object] | None = None,
+                 repeat: int = 5, number: int = 1000) -> None:
+        self._implementations: dict[str, type[Implementation]] = {}
+        self._cache_path = Path(cache_path) if cache_path else None
+        self._workload = workload or run_operation
+        self._repeat = repeat
+        self._number = number
+        self._fastest: type[Implementation] | None = None
+        self.timings: dict[str, float] = {}
+
+    def register(self, cls: type[Implementation]) -> type[Implementation]:
+        '''
+        Регистрирует Реализацию; можно использовать как декоратор класса.
+        '''
+        self._implementations[cls.__qualname__] = cls
+        self._fastest = None
+        return cls
+
+    def _cache_key(self) -> str:
+        workload = getattr(self._workload, '__qualname__', repr(self._workload))
+        return f'{workload}:{",".join(sorted(self._implementations))}'
+
+    def _load_choice(self) -> type[Implementation] | None:
+        if self._cache_path is None or not self._cache_path.exists():
+            return None
+        try:
+            cached = json.loads(self._cache_path.read_text())
+        except (OSError, ValueError):
+            return None
+        choice = cached.get(self._cache_key())
+        return self._implementations.get(choice)
+
+    def _store_choice(self, cls: type[Implementation]) -> None:
+        if self._cache_path is None:
+            return
+        try:
+            cached = json.loads(self._cache_path.read_text())
+        except (OSError, ValueError):
+            cached = {}
+        cached[self._cache_key()] = cls.__qualname__
+        self._cache_path.write_text(json.dumps(cached, indent=2))
+
+    def autotune(self) -> type[Implementation]:
+        '''
+        Замеряет все Реализации и запоминает самую быструю. Берётся лучший
+        из нескольких прогонов, чтобы уменьшить влияние шума.
+        '''
+        if not self._implementations:
+            raise LookupError('no implementations registered')
+        self.timings = {}
+        for name, cls in self._implementations.items():
+            impl = cls()
+            timer = Timer(lambda: self._workload(impl))
+            best = min(timer.repeat(repeat=self._repeat, number=self._number))
+            self.timings[name] = best / self._number
+        fastest = min(self.timings, key=self.timings.get)
+        self._fastest = self._implementations[fastest]
+        self._store_choice(self._fastest)
+        return self._fastest
+
+    def fastest(self) -> type[Implementation]:
+        if self._fastest is None:
+            self._fastest = self._load_choice() or self.autotune()
+        return self._fastest
+
+
 def client_code(abstraction: Abstraction):
     print(abstraction.operation(), end="")
 
@@ -85,4 +303,22 @@ if __name__ == '__main__':
 
     implementation = ConcreteImplementationB()
     abstraction = Abstraction(implementation)
-    client_code(abstraction)
\ No newline at end of file
+    client_code(abstraction)
+
+    print('\n')
+
+    registry = ImplementationRegistry()
+    registry.register(ConcreteImplementationA)
+    registry.register(ConcreteImplementationB)
+    abstraction = Abstraction.from_registry(registry)
+    client_code(abstraction)
+    print('')
+    for name, seconds in registry.timings.items():
+        print(f'{name}: {seconds * 1e9:.1f} ns per operation')
+
+    print('')
+
+    implementations = [ConcreteImplementationA(), ConcreteImplementationB()]
+    abstraction = FanOutAbstraction(implementations, mode='all', timeouts=1.0)
+    client_code(abstraction)
+    abstraction.close()
\ No newline at end of file
@@ -1,3 +1,220 @@
 '''
-Нет, описывать это уже перебор
-'''
\ No newline at end of file
+Фасад - это структурный паттерн, который предоставляет простой (но урезанный)
+интерфейс к сложной системе объектов, библиотеке или фреймворку.
+
+Кроме того, что Фасад позволяет снизить общую сложность программы, он также
+помогает вынести код, зависимый от внешней системы в единственное место.
+
+Применимость: Паттерн часто встречается в клиентских приложениях, написанных
+на Python, которые используют классы-фасады для упрощения работы со сложными
+библиотеками или API.
+
+Признаки применения паттерна: Фасад угадывается в классе, который имеет
+простой интерфейс, но делегирует основную часть работы другим классам. Чаще
+всего, фасады сами следят за жизненным циклом объектов сложной системы.
+'''
+
+from __future__ import annotations
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from time import perf_counter, sleep
+from typing import Any, Callable
+
+
+class Subsystem1:
+    """
+    Подсистема может принимать запросы либо от фасада, либо от клиента
+    напрямую. В любом случае, для Подсистемы Фасад - это ещё один клиент, и
+    он не является частью Подсистемы.
+    """
+
+    def start(self) -> None:
+        sleep(0.1)
+
+    def operation1(self) -> str:
+        return 'Subsystem1: Ready!'
+
+    def operation_n(self) -> str:
+        return 'Subsystem1: Go!'
+
+
+class Subsystem2:
+    """
+    Некоторые фасады могут работать с разными подсистемами одновременно.
+    """
+
+    def start(self) -> None:
+        sleep(0.1)
+
+    def operation1(self) -> str:
+        return 'Subsystem2: Get ready!'
+
+    def operation_z(self) -> str:
+        return 'Subsystem2: Fire!'
+
+
+class Facade:
+    """
+    Класс Фасада предоставляет простой интерфейс для сложной логики одной или
+    нескольких подсистем. Фасад делегирует запросы клиентов соответствующим
+    объектам внутри подсистемы. Фасад также отвечает за управление их
+    жизненным циклом.
+    """
+
+    def __init__(self, subsystem1: Subsystem1 | None = None,
+                 subsystem2: Subsystem2 | None = None) -> None:
+        self._subsystem1 = subsystem1 or Subsystem1()
+        self._subsystem2 = subsystem2 or Subsystem2()
+
+    def operation(self) -> str:
+        results = [
+            'Facade initializes subsystems:',
+            self._subsystem1.operation1(),
+            self._subsystem2.operation1(),
+            'Facade orders subsystems to perform the action:',
+            self._subsystem1.operation_n(),
+            self._subsystem2.operation_z(),
+        ]
+        return '\n'.join(results)
+
+
+@dataclass
+class StartupTiming:
+    started: float
+    duration: float
+
+
+class ConcurrentFacade:
+    """
+    Фасад, который сам запускает свои подсистемы. Каждая подсистема
+    объявляется фабрикой и списком зависимостей; независимые подсистемы
+    стартуют параллельно в пуле потоков, а зависимая начинает запуск только
+    после всех своих зависимостей. Так время холодного старта сводится к
+    самой длинной цепочке зависимостей вместо суммы всех запусков.
+
+    Для каждой подсистемы записывается момент начала запуска (относительно
+    начала старта фасада) и его длительность.
+    """
+
+    def __init__(self, max_workers: int | None = None) -> None:
+        self._declarations: dict[str, tuple[Callable[[], Any],
+                                            tuple[str, ...]]] = {}
+        self._subsystems: dict[str, Any] = {}
+        self._max_workers = max_workers
+        self.timings: dict[str, StartupTiming] = {}
+
+    def register(self, name: str, factory: Callable[[], Any],
+                 depends_on: tuple[str, ...] = ()) -> None:
+        '''
+        Объявляет подсистему. Фабрика создаёт объект, а его метод start(),
+        если он есть, вызывается сразу после создания.
+        '''
+        if name in self._declarations:
+            raise ValueError(f'subsystem {name!r} is already registered')
+        self._declarations[name] = (factory, tuple(depends_on))
+
+    def __getitem__(self, name: str) -> Any:
+        return self._subsystems[name]
+
+    def _check_dependencies(self) -> None:
+        for name, (_, depends_on) in self._declarations.items():
+            for dependency in depends_on:
+                if dependency not in self._declarations:
+                    raise LookupError(
+                        f'{name!r} depends on unknown subsystem {dependency!r}'
+                    )
+        visiting, done = set(), set()
+
+        def visit(name: str) -> None:
+            if name in done:
+                return
+            if name in visiting:
+                raise ValueError(f'dependency cycle through {name!r}')
+            visiting.add(name)
+            for dependency in self._declarations[name][1]:
+                visit(dependency)
+            visiting.discard(name)
+            done.add(name)
+
+        for name in self._declarations:
+            visit(name)
+
+    def _start_one(self, name: str, origin: float) -> Any:
+        factory, _ = self._declarations[name]
+        t0 = perf_counter()
+        subsystem = factory()
+        start = getattr(subsystem, 'start', None)
+        if start is not None:
+            start()
+        self.timings[name] = StartupTiming(t0 - origin, perf_counter() - t0)
+        return subsystem
+
+    def start(self) -> float:
+        '''
+        Запускает все подсистемы и возвращает общее время старта. Если одна
+        из подсистем упала, ещё не начатые запуски отменяются, а исключение
+        пробрасывается клиенту.
+        '''
+        self._check_dependencies()
+        origin = perf_counter()
+        waiting = {name: set(depends_on)
+                   for name, (_, depends_on) in self._declarations.items()
+                   if name not in self._subsystems}
+        for dependencies in waiting.values():
+            dependencies.difference_update(self._subsystems)
+        running: dict[Future, str] = {}
+
+        with ThreadPoolExecutor(max_workers=self._max_workers,
+                                thread_name_prefix='facade-start') as pool:
+            def submit_ready() -> None:
+                for name in [n for n, deps in waiting.items() if not deps]:
+                    del waiting[name]
+                    running[pool.submit(self._start_one, name, origin)] = name
+
+            submit_ready()
+            while running:
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    name = running.pop(future)
+                    try:
+                        self._subsystems[name] = future.result()
+                    except BaseException:
+                        for other in running:
+                            other.cancel()
+                        raise
+                    for dependencies in waiting.values():
+                        dependencies.discard(name)
+                submit_ready()
+        return perf_counter() - origin
+
+    def report(self) -> str:
+        lines = []
+        for name, timing in sorted(self.timings.items(),
+                                   key=lambda item: item[1].started):
+            lines.append(f'{name:<12} started at {timing.started * 1e3:7.1f} ms,'
+                         f' took {timing.duration * 1e3:7.1f} ms')
+        return '\n'.join(lines)
+
+
+def client_code(facade: Facade) -> None:
+    '''
+    Клиентский код работает со сложными подсистемами через простой интерфейс,
+    предоставляемый Фасадом. Когда фасад управляет жизненным циклом
+    подсистемы, клиент может даже не знать о существовании подсистемы. Такой
+    подход позволяет держать сложность под контролем.
+    '''
+    print(facade.operation(), end='')
+
+
+if __name__ == '__main__':
+    facade = ConcurrentFacade()
+    facade.register('subsystem1', Subsystem1)
+    facade.register('subsystem2', Subsystem2)
+    facade.register('facade', lambda: Facade(facade['subsystem1'],
+                                             facade['subsystem2']),
+                    depends_on=('subsystem1', 'subsystem2'))
+    total = facade.start()
+    client_code(facade['facade'])
+    print('\n')
+    print(facade.report())
+    print(f'Total startup: {total * 1e3:.1f} ms')